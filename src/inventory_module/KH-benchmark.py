@@ -0,0 +1,346 @@
+# MECS1023 Advance DSA Group 11
+# Student: Tee Kah Hock MEC245061
+# Title : Furniture Inventory Control Module - Benchmark Suite
+#
+# Non-interactive benchmarks for FurnitureBST / FurnitureAVL and load_data_from_csv.
+# Every run varies data size, SKU arrival order and operation mix. Per-operation rows
+# report throughput and p50/p95/p99 latency per operation; whole-batch loads (bulk_load,
+# CSV and snapshot loads) are repeated --repeats times and report p50/p95/p99 over the
+# runs. Results are written to a JSON file so runs from different versions can be compared.
+#
+# Example:
+#   python KH-benchmark.py --sizes 1000 10000 100000 --output bench_inventory.json
+#   python KH-benchmark.py --sizes 1000000 --trees avl --orders random sorted
+#   python KH-benchmark.py --mix read-heavy write-heavy search=50,insert=50
+
+import argparse
+import contextlib
+import csv
+import datetime
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+# The module file name contains a dash, so it is loaded from its path
+_MODULE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'KH-Task_2_code.py')
+_spec = importlib.util.spec_from_file_location('kh_inventory', _MODULE_PATH)
+inventory = importlib.util.module_from_spec(_spec)
+sys.modules['kh_inventory'] = inventory
+_spec.loader.exec_module(inventory)
+
+TREES = {'bst': inventory.FurnitureBST, 'avl': inventory.FurnitureAVL}
+ORDERS = ('random', 'sorted', 'reverse', 'clustered')
+
+CATEGORIES = {'WRD': 'Wardrobe', 'BED': 'Bed', 'BNH': 'Bench', 'STL': 'Stool', 'CAB': 'Cabinet',
+              'DRS': 'Dresser', 'CNS': 'Console', 'BSF': 'Bookshelf', 'TAB': 'Table',
+              'CHR': 'Chair', 'SOF': 'Sofa', 'DSK': 'Desk'}
+MATERIALS = {'W': 'Wood', 'L': 'Leather', 'R': 'Rattan', 'G': 'Glass', 'M': 'Metal',
+             'C': 'Composite', 'P': 'Plastic', 'F': 'Fabric'}
+COLORS = {'RED': 'Red', 'NAT': 'Natural', 'BGE': 'Beige', 'BLK': 'Black', 'OAK': 'Oak',
+          'BRN': 'Brown', 'GRY': 'Grey', 'WHT': 'White', 'BLU': 'Blue', 'GRN': 'Green'}
+SUPPLIERS = ('Urban Living', 'FurniWorld', 'Classic Interiors', 'Global Furnish',
+             'Nova Supplies', 'EverWood', 'ComfortLine', 'Homedecor Co.')
+
+
+###############################################################################
+# DATA GENERATION
+###############################################################################
+
+# Returns `count` distinct items with SKUs in the same CAT-M-COL-NNNNN shape as the real CSV
+def generate_items(count, rng, start=0):
+    prefixes = [(c, m, k) for c in CATEGORIES for m in MATERIALS for k in COLORS]
+    base_date = datetime.date(2024, 1, 1).toordinal()
+    items = []
+    for number in range(start, start + count):
+        category, material, color = prefixes[number % len(prefixes)]
+        sku = f"{category}-{material}-{color}-{number // len(prefixes) + 1:05d}"
+        name = f"{MATERIALS[material]} {CATEGORIES[category]}"
+        supplier = SUPPLIERS[number % len(SUPPLIERS)]
+        items.append(inventory.FurnitureItem(
+            sku, name, CATEGORIES[category], MATERIALS[material], COLORS[color],
+            f"{'ABCD'[rng.randrange(4)]}{rng.randint(1, 5)}-R{rng.randint(1, 4)}",
+            rng.randint(0, 500), supplier, base_date + rng.randrange(640),
+            f"{name} - {MATERIALS[material]} {COLORS[color]} design, sourced from {supplier}."))
+    return items
+
+# Arranges items in one of the key orders we see in real feeds
+def arrange(items, order, rng):
+    items = list(items)
+    if order == 'random':
+        rng.shuffle(items)
+    elif order == 'sorted':
+        items.sort(key=lambda item: item.sku)
+    elif order == 'reverse':
+        items.sort(key=lambda item: item.sku, reverse=True)
+    elif order == 'clustered':
+        # Whole SKU-prefix families arrive together (sorted inside), families in random order
+        families = {}
+        for item in sorted(items, key=lambda item: item.sku):
+            families.setdefault(item.sku.rsplit('-', 1)[0], []).append(item)
+        keys = list(families)
+        rng.shuffle(keys)
+        items = [item for key in keys for item in families[key]]
+    else:
+        raise ValueError(f"Unknown key order '{order}'")
+    return items
+
+def write_csv(filename, items):
+    with open(filename, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(inventory.CSV_COLUMNS)
+        for item in items:
+            writer.writerow([item.sku, item.item_name, item.category, item.material, item.color,
+                             item.warehouse_location, item.quantity, item.supplier,
+                             item.last_updated, item.description])
+
+
+###############################################################################
+# MEASUREMENT
+###############################################################################
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    position = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[position]
+
+# Builds one result row from per-operation latencies (nanoseconds)
+def summarize(context, operation, latencies_ns):
+    latencies_ns = sorted(latencies_ns)
+    total_ns = sum(latencies_ns)
+    count = len(latencies_ns)
+    row = dict(context)
+    row.update({
+        'operation': operation,
+        'count': count,
+        'total_s': total_ns / 1e9,
+        'throughput_ops': count / (total_ns / 1e9) if total_ns else 0.0,
+        'p50_us': percentile(latencies_ns, 0.50) / 1000,
+        'p95_us': percentile(latencies_ns, 0.95) / 1000,
+        'p99_us': percentile(latencies_ns, 0.99) / 1000,
+    })
+    return row
+
+# Builds one result row for a whole-batch load of `size` items timed once per run
+# (nanoseconds). Percentiles are over the runs, in milliseconds per run.
+def summarize_batch(context, operation, run_ns, size):
+    run_ns = sorted(run_ns)
+    total_ns = sum(run_ns)
+    row = dict(context)
+    row.update({
+        'operation': operation,
+        'count': size * len(run_ns),
+        'runs': len(run_ns),
+        'total_s': total_ns / 1e9,
+        'throughput_ops': size * len(run_ns) / (total_ns / 1e9) if total_ns else 0.0,
+        'p50_run_ms': percentile(run_ns, 0.50) / 1e6,
+        'p95_run_ms': percentile(run_ns, 0.95) / 1e6,
+        'p99_run_ms': percentile(run_ns, 0.99) / 1e6,
+    })
+    return row
+
+def timed(function, *args):
+    start = time.perf_counter_ns()
+    result = function(*args)
+    return time.perf_counter_ns() - start, result
+
+# Runs `operations` callables drawn from the weighted mix and records latency per kind
+def run_mix(tree, mix, operations, rng, present, absent, fresh):
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    latencies = {kind: [] for kind in kinds}
+    present = list(present)
+    for kind in rng.choices(kinds, weights, k=operations):
+        if kind == 'search':
+            sku = present[rng.randrange(len(present))].sku if present else 'NONE'
+            elapsed, _ = timed(tree.search, sku)
+        elif kind == 'miss':
+            elapsed, _ = timed(tree.search, absent[rng.randrange(len(absent))])
+        elif kind == 'insert':
+            if not fresh:
+                continue
+            item = fresh.pop()
+            elapsed, _ = timed(tree.insert, item)
+            present.append(item)
+        elif kind == 'delete':
+            if not present:
+                continue
+            index = rng.randrange(len(present))
+            item = present[index]
+            elapsed, _ = timed(tree.delete, item.sku)
+            # Swap-remove so picking a random victim stays O(1)
+            last = present.pop()
+            if last is not item:
+                present[index] = last
+        elif kind == 'range':
+            prefix = present[rng.randrange(len(present))].sku.rsplit('-', 1)[0] if present else ''
+            elapsed, _ = timed(lambda: sum(1 for _ in tree.iter_prefix(prefix)))
+        else:
+            raise ValueError(f"Unknown operation '{kind}' in mix")
+        latencies[kind].append(elapsed)
+    return latencies
+
+MIX_PRESETS = {
+    'balanced': 'search=70,miss=10,insert=10,delete=5,range=5',
+    'read-heavy': 'search=85,miss=10,range=5',
+    'write-heavy': 'search=20,insert=40,delete=40',
+    'scan-heavy': 'search=40,range=60',
+}
+
+# A preset name or a spec like "search=80,insert=10,delete=10". Returns (name, mix).
+def parse_mix(text):
+    spec = MIX_PRESETS.get(text, text)
+    mix = {}
+    for part in spec.split(','):
+        kind, _, weight = part.partition('=')
+        mix[kind.strip()] = float(weight or 1)
+    return text, mix
+
+
+###############################################################################
+# BENCHMARKS
+###############################################################################
+
+def bench_tree(tree_name, size, order, args, rng):
+    context = {'benchmark': 'tree', 'tree': tree_name, 'size': size, 'order': order}
+    results = []
+    items = arrange(generate_items(size, rng), order, rng)
+
+    # A plain BST on sorted input is a linked list: O(n^2) build and recursion overflow
+    degenerate = tree_name == 'bst' and order in ('sorted', 'reverse') and size > args.max_unbalanced
+    if degenerate:
+        results.append(dict(context, operation='build_insert', skipped='degenerate unbalanced input'))
+        return results
+
+    # Row-by-row insert
+    tree = TREES[tree_name]()
+    latencies = []
+    try:
+        for item in items:
+            elapsed, _ = timed(tree.insert, item)
+            latencies.append(elapsed)
+    except RecursionError:
+        results.append(dict(context, operation='build_insert', skipped='recursion limit'))
+        return results
+    results.append(summarize(context, 'build_insert', latencies))
+    context['height'] = tree.get_height()
+
+    # Bulk load of the same batch into an empty tree, once per repeat
+    runs = [timed(TREES[tree_name]().bulk_load, items)[0] for _ in range(args.repeats)]
+    results.append(summarize_batch(context, 'bulk_load', runs, size))
+
+    # Each operation mix on its own row-by-row tree (the first reuses the timed build)
+    absent = [item.sku + 'X' for item in items[:1000]]
+    for number, (mix_name, mix) in enumerate(args.mix):
+        if number:
+            tree = TREES[tree_name]()
+            for item in items:
+                tree.insert(item)
+        fresh = generate_items(args.operations, rng, start=size)
+        latencies = run_mix(tree, mix, args.operations, rng, items, absent, fresh)
+        for kind, values in latencies.items():
+            if values:
+                results.append(summarize(dict(context, mix=mix_name), kind, values))
+    return results
+
+def bench_csv(tree_name, size, order, args, rng, workdir):
+    context = {'benchmark': 'load_data_from_csv', 'tree': tree_name, 'size': size, 'order': order}
+    results = []
+    filename = os.path.join(workdir, f"inventory_{size}_{order}.csv")
+    if not os.path.exists(filename):
+        write_csv(filename, arrange(generate_items(size, random.Random(args.seed)), order, rng))
+
+    for bulk in (True, False):
+        operation = 'load_csv_bulk' if bulk else 'load_csv_rows'
+        if not bulk and tree_name == 'bst' and order in ('sorted', 'reverse') and size > args.max_unbalanced:
+            results.append(dict(context, operation=operation, skipped='degenerate unbalanced input'))
+            continue
+        runs = []
+        for _ in range(args.repeats):
+            with contextlib.redirect_stdout(io.StringIO()):
+                runs.append(timed(inventory.load_data_from_csv, filename, TREES[tree_name](), bulk)[0])
+        results.append(summarize_batch(context, operation, runs, size))
+
+    # Snapshot startup path for the same file
+    tree = TREES[tree_name]()
+    snapshot = filename + '.snap'
+    with contextlib.redirect_stdout(io.StringIO()):
+        inventory.load_data_from_csv(filename, tree)
+    inventory.save_snapshot(tree, snapshot, filename)
+    runs = [timed(inventory.load_snapshot, snapshot, filename, TREES[tree_name]())[0]
+            for _ in range(args.repeats)]
+    results.append(summarize_batch(context, 'load_snapshot', runs, size))
+    return results
+
+
+def print_row(row):
+    if 'skipped' in row:
+        print(f"{row['benchmark']:<19} {row['tree']:<4} {row['size']:>8} {row['order']:<9} "
+              f"{row['operation']:<14} skipped: {row['skipped']}")
+        return
+    label = f"{row['operation']} [{row['mix']}]" if 'mix' in row else row['operation']
+    if 'runs' in row:
+        latency = (f"p50 {row['p50_run_ms']:>8.2f}ms  p95 {row['p95_run_ms']:>8.2f}ms  "
+                   f"p99 {row['p99_run_ms']:>8.2f}ms per run ({row['runs']} runs)")
+    else:
+        latency = f"p50 {row['p50_us']:>8.2f}us  p95 {row['p95_us']:>8.2f}us  p99 {row['p99_us']:>8.2f}us"
+    print(f"{row['benchmark']:<19} {row['tree']:<4} {row['size']:>8} {row['order']:<9} "
+          f"{label:<26} {row['throughput_ops']:>12.0f} ops/s  {latency}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Inventory module benchmark suite')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--orders', nargs='+', choices=ORDERS, default=list(ORDERS))
+    parser.add_argument('--trees', nargs='+', choices=sorted(TREES), default=sorted(TREES))
+    parser.add_argument('--mix', type=parse_mix, nargs='+',
+                        default=[parse_mix(name) for name in ('balanced', 'read-heavy', 'write-heavy')],
+                        help=f"operation mixes to run: presets ({', '.join(MIX_PRESETS)}) "
+                             "or weights such as search=80,insert=10,delete=10")
+    parser.add_argument('--repeats', type=int, default=5, help='runs per whole-batch load')
+    parser.add_argument('--operations', type=int, default=10000, help='operations per mix run')
+    parser.add_argument('--max-unbalanced', type=int, default=2000,
+                        help='largest size to run the plain BST on sorted/reverse input')
+    parser.add_argument('--skip-csv', action='store_true', help='skip the load_data_from_csv benchmarks')
+    parser.add_argument('--seed', type=int, default=1023)
+    parser.add_argument('--output', default='bench_inventory.json')
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            for order in args.orders:
+                for tree_name in args.trees:
+                    rows = bench_tree(tree_name, size, order, args, rng)
+                    if not args.skip_csv:
+                        rows += bench_csv(tree_name, size, order, args, rng, workdir)
+                    for row in rows:
+                        print_row(row)
+                    results.extend(rows)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'sizes': args.sizes,
+            'orders': args.orders,
+            'mixes': dict(args.mix),
+            'operations': args.operations,
+            'repeats': args.repeats,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(f"\nWrote {len(results)} result rows to {args.output}")
+
+if __name__ == "__main__":
+    main()
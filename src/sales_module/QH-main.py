@@ -1,27 +1,62 @@
-from src.order_bst import OrderBST 
+import argparse
+import importlib.util
+import os
+import sys
 
-def demonstrate_bst_operations():
+# QH-order_bst.py has a dash in its name, so it is loaded from its path
+_spec = importlib.util.spec_from_file_location(
+    'qh_order_bst', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'QH-order_bst.py'))
+order_bst = importlib.util.module_from_spec(_spec)
+sys.modules['qh_order_bst'] = order_bst
+_spec.loader.exec_module(order_bst)
+OrderBST = order_bst.OrderBST
+
+# Real intake path: python QH-main.py orders.csv (or orders.jsonl)
+def ingest_order_file(order_tree, filename):
+    reader = order_bst.read_orders_jsonl if filename.endswith('.jsonl') else order_bst.read_orders_csv
+    with open(filename, mode='r', encoding='utf-8-sig', newline='') as stream:
+        return order_tree.add_orders(reader(stream))
+
+def demonstrate_bst_operations(order_files=(), journal_filename=None):
     
     # Initialize the BST 
     order_tree = OrderBST()
+    customer_index = order_tree.add_index(order_bst.CustomerOrderIndex())
+    status_index = order_tree.add_index(order_bst.DeliveryStatusIndex())
+    date_index = order_tree.add_index(order_bst.OrderDateIndex())
+    region_index = order_tree.add_index(order_bst.RegionDispatchIndex())
     print("=" * 60)
     print("Customer Order & Delivery Management Module BST Demonstration")
     print("=" * 60)
+
+    # With a journal, orders from earlier runs are recovered and every change is kept
+    journal = None
+    if journal_filename:
+        journal = order_bst.OrderJournal(journal_filename)
+        replayed = journal.open(order_tree)
+        print(f"Recovered orders from {journal_filename} ({replayed} journal entries replayed).")
     
     # Demonstration
     # --- 1. Insert ---
     print("--- 1. Insert ---")
 
-    # Initializa dataset by inserting a sample set of orders to build the tree structure
-    order_tree.add_order(30, 101, ('Laptop', 3), "123 Main Street")
-    order_tree.add_order(60, 102, ('Monitor', 2), "456 Queenstown")
-    order_tree.add_order(90, 103, ('Keyboard', 6), "789 Taman Durian")
-    order_tree.add_order(45, 104, ('Mouse', 12), "111, First Town")
-    order_tree.add_order(75, 105, ('Webcam', 8), "222, Dorian Street")
-    order_tree.add_order(15, 106, ('Earphone', 30), "333, Taman Garden")
-    
-    # Attempt to insert duplcate
-    order_tree.add_order(30, 101, ('Laptop', 6), "123 Main Street")
+    # Initializa dataset by inserting a sample set of orders to build the tree structure.
+    # Order files given on the command line go through the same batch intake.
+    sample_orders = [
+        (30, 101, ('Laptop', 3), "123 Main Street"),
+        (60, 102, ('Monitor', 2), "456 Queenstown"),
+        (90, 103, ('Keyboard', 6), "789 Taman Durian"),
+        (45, 104, ('Mouse', 12), "111, First Town"),
+        (75, 105, ('Webcam', 8), "222, Dorian Street"),
+        (15, 106, ('Earphone', 30), "333, Taman Garden"),
+        # Attempt to insert duplcate
+        (30, 101, ('Laptop', 6), "123 Main Street"),
+    ]
+    summary = order_tree.add_orders(sample_orders)
+    print(f"Duplicate order IDs skipped: {summary['duplicate_ids']}")
+    for filename in order_files:
+        summary = ingest_order_file(order_tree, filename)
+        print(f"{filename}: {summary['inserted']} added, {summary['duplicates']} duplicate(s).")
 
     print("------------------------------------------")
 
@@ -85,5 +120,54 @@ def demonstrate_bst_operations():
 
     print("------------------------------------------")
 
+    # --- 6. Customer History ---
+    print("--- 6. Customer History ---")
+
+    # Order 30 (customer 101) was deleted above, so the index must no longer list it
+    for customer_id in (101, 102):
+        history = customer_index.history(customer_id)
+        print(f"Customer {customer_id}: {len(history)} order(s)")
+        for order in history:
+            print(f"  {order.order_date} {order}")
+
+    print("------------------------------------------")
+
+    # --- 7. Dispatch Queue ---
+    print("--- 7. Dispatch Queue ---")
+
+    print(f"Orders per status: {status_index.counts()}")
+    for order in status_index.pull_pending(order_tree, 2):
+        print(f"Dispatched: {order}")
+    print(f"Orders per status: {status_index.counts()}")
+
+    print("------------------------------------------")
+
+    # --- 8. Daily Sales ---
+    print("--- 8. Daily Sales ---")
+
+    report = date_index.sales_report()
+    for order_date, rollup in report['days'].items():
+        print(f"{order_date}: {rollup['orders']} order(s), items {rollup['items']}")
+    print(f"Total: {report['total']['orders']} order(s), items {report['total']['items']}")
+
+    print("------------------------------------------")
+
+    # --- 9. Truck Batches ---
+    print("--- 9. Truck Batches ---")
+
+    # Pending orders grouped by delivery region, at most 20 items per truck
+    for batch in region_index.plan_batches(20):
+        order_ids = [order.order_id for order in batch['orders']]
+        print(f"Region '{batch['region']}': orders {order_ids}, {batch['quantity']} item(s)")
+
+    print("------------------------------------------")
+
+    if journal is not None:
+        journal.close()
+
 if __name__ == "__main__":
-    demonstrate_bst_operations()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Order BST demonstration')
+    parser.add_argument('order_files', nargs='*', help='orders.csv / orders.jsonl files to ingest')
+    parser.add_argument('--journal', help='order journal file that keeps orders between runs')
+    args = parser.parse_args()
+    demonstrate_bst_operations(args.order_files, args.journal)
\ No newline at end of file
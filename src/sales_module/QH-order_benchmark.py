@@ -0,0 +1,128 @@
+# Workload comparison for the order stores in QH-order_bst.py.
+#
+# Builds each tree from the same intake trace, then replays a recency-skewed access trace:
+# most lookups and status updates hit the few hundred most recent orders, the rest are
+# spread over the whole history. Reports throughput per operation and the average depth
+# at which the accessed order was found (trees only; the block store has no depth).
+#
+# Examples:
+#   python QH-order_benchmark.py --orders 100000 --accesses 200000 --hot 300
+#   python QH-order_benchmark.py --orders 1000000 --id-order sequential   # 1M sequential-ID intake
+
+import argparse
+import importlib.util
+import os
+import random
+import sys
+import time
+
+# The module file name contains a dash, so it is loaded from its path
+_MODULE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'QH-order_bst.py')
+_spec = importlib.util.spec_from_file_location('qh_order_bst', _MODULE_PATH)
+order_bst = importlib.util.module_from_spec(_spec)
+sys.modules['qh_order_bst'] = order_bst
+_spec.loader.exec_module(order_bst)
+
+TREES = {'bst': order_bst.OrderBST, 'splay': order_bst.SplayOrderTree, 'block': order_bst.BlockOrderStore}
+STATUSES = ('Pending', 'Packed', 'In Transit', 'Delivered')
+
+
+# Order ids in arrival order. 'random' ids are unique but unordered, which is the only
+# intake order the unbalanced OrderBST survives at large sizes.
+def intake_trace(count, id_order, rng):
+    ids = list(range(1, count + 1))
+    if id_order == 'random':
+        rng.shuffle(ids)
+    return ids
+
+# Recency-skewed accesses: with probability hot_share pick one of the `hot` most recently
+# added orders (newest most likely), otherwise any order uniformly.
+def access_trace(ids, count, hot, hot_share, rng):
+    trace = []
+    recent = ids[-hot:]
+    for _ in range(count):
+        if rng.random() < hot_share:
+            # Geometric-like skew towards the newest of the hot orders
+            position = min(len(recent) - 1, int(rng.expovariate(8.0 / len(recent))))
+            order_id = recent[-1 - position]
+        else:
+            order_id = ids[rng.randrange(len(ids))]
+        operation = 'update' if rng.random() < 0.3 else 'find'
+        trace.append((operation, order_id))
+    return trace
+
+def depth_of(tree, order_id):
+    if isinstance(tree, order_bst.BlockOrderStore):
+        return None
+    depth = 0
+    node = tree.root
+    while node is not None and node.order_id != order_id:
+        node = node.left if order_id < node.order_id else node.right
+        depth += 1
+    return depth
+
+def run(tree_name, ids, trace, rng):
+    tree = TREES[tree_name]()
+    # Per-operation logging off, so we time the tree and not the console
+    tree.verbose = False
+    start = time.perf_counter()
+    for order_id in ids:
+        tree.add_order(order_id, rng.randrange(1, 5000), ('Chair', 1), 'Warehouse Road')
+    intake_seconds = time.perf_counter() - start
+
+    timings = {'find': 0.0, 'update': 0.0}
+    counts = {'find': 0, 'update': 0}
+    depth_total = 0
+    sampled = 0
+    for step, (operation, order_id) in enumerate(trace):
+        if step % 100 == 0:
+            # Depth before the access, i.e. the cost the access is about to pay
+            depth = depth_of(tree, order_id)
+            if depth is not None:
+                depth_total += depth
+                sampled += 1
+        start = time.perf_counter()
+        if operation == 'find':
+            tree.find_order(order_id)
+        else:
+            tree.update_order_status(order_id, STATUSES[step % len(STATUSES)])
+        timings[operation] += time.perf_counter() - start
+        counts[operation] += 1
+
+    return {
+        'tree': tree_name,
+        'intake_ops': len(ids) / intake_seconds if intake_seconds else 0.0,
+        'find_ops': counts['find'] / timings['find'] if timings['find'] else 0.0,
+        'update_ops': counts['update'] / timings['update'] if timings['update'] else 0.0,
+        'avg_depth': depth_total / sampled if sampled else None,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Order tree workload comparison')
+    parser.add_argument('--orders', type=int, default=50000)
+    parser.add_argument('--accesses', type=int, default=200000)
+    parser.add_argument('--hot', type=int, default=300, help='size of the recent-order working set')
+    parser.add_argument('--hot-share', type=float, default=0.9, help='fraction of accesses to hot orders')
+    parser.add_argument('--id-order', choices=('random', 'sequential'), default='random')
+    parser.add_argument('--trees', nargs='+', choices=sorted(TREES), default=sorted(TREES))
+    parser.add_argument('--seed', type=int, default=11)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    ids = intake_trace(args.orders, args.id_order, rng)
+    trace = access_trace(ids, args.accesses, args.hot, args.hot_share, rng)
+    print(f"{args.orders} orders ({args.id_order} ids), {args.accesses} accesses, "
+          f"{args.hot_share:.0%} to the newest {args.hot}")
+    print(f"{'tree':<8}{'intake/s':>12}{'find/s':>12}{'update/s':>12}{'avg depth':>11}")
+    for tree_name in args.trees:
+        try:
+            result = run(tree_name, ids, trace, random.Random(args.seed))
+        except RecursionError:
+            print(f"{tree_name:<8} failed: recursion limit (unbalanced tree)")
+            continue
+        depth = '-' if result['avg_depth'] is None else f"{result['avg_depth']:.1f}"
+        print(f"{result['tree']:<8}{result['intake_ops']:>12.0f}{result['find_ops']:>12.0f}"
+              f"{result['update_ops']:>12.0f}{depth:>11}")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,13 @@
+import base64
+import bisect
+import collections
+import csv
 import datetime
+import json
+import os
+import re
+import threading
+import time
 
 class OrderNode:
     def __init__(self, order_id, customer_id, item_details, delivery_address, order_date=None, status='Pending'):
@@ -24,24 +33,90 @@ class OrderNode:
     def __str__(self):
         return f"ID: {self.order_id} | Customer: {self.customer_id} | Status: {self.delivery_status} | Items: {self.item_details}"
 
+# Normalizes an order given as a tuple (order_id, customer_id, item_details,
+# delivery_address[, order_date[, status]]) or a dict with those keys into the full
+# six-field tuple. A missing date becomes `today` (default: date.today()).
+def order_fields(order, today=None):
+    if isinstance(order, dict):
+        order = (order['order_id'], order['customer_id'], order['item_details'],
+                 order['delivery_address'], order.get('order_date'), order.get('status'))
+    order_id, customer_id, item_details, delivery_address = order[:4]
+    order_date = order[4] if len(order) > 4 and order[4] is not None else (today or datetime.date.today())
+    status = order[5] if len(order) > 5 and order[5] else 'Pending'
+    return order_id, customer_id, item_details, delivery_address, order_date, status
+
+
 class OrderBST:
     def __init__(self):
         self.root = None
+        self.verbose = True # Print a line for every operation (turned off for bulk intake)
+        self.indexes = []   # Secondary indexes, kept in sync on every add and delete
+        self.journal = None # OrderJournal that records every change (see OrderJournal.open)
+
+    def _log(self, message):
+        if self.verbose:
+            print(message)
         
-    def add_order(self, order_id, customer_id, item_details, delivery_address):
-        new_node = OrderNode(order_id, customer_id, item_details, delivery_address)
+    def add_order(self, order_id, customer_id, item_details, delivery_address, order_date=None, status='Pending'):
+        new_node = OrderNode(order_id, customer_id, item_details, delivery_address, order_date, status)
+        return self._add_node(new_node)
+
+    # Inserts the node into the tree and, if it was added, into every index
+    def _add_node(self, new_node):
+        if not self._insert_node(new_node):
+            return False
+        for index in self.indexes:
+            index.add(new_node)
+        if self.journal is not None:
+            self.journal.record_add(new_node)
+        return True
+
+    # Attach a secondary index and fill it with the orders already in the tree
+    def add_index(self, index):
+        for order in self.iter_orders():
+            index.add(order)
+        self.indexes.append(index)
+        return index
+
+    def _insert_node(self, new_node):
         if self.root is None:
             self.root = new_node
-            print(f"Order {order_id} added successfully.")
+            self._log(f"Order {new_node.order_id} added successfully.")
             return True
         return self._insert_binary_tree(self.root, new_node)
 
+    # Bulk intake: inserts many orders with per-order logging switched off and returns
+    # {'inserted': n, 'duplicates': n, 'duplicate_ids': [...]} for the batch.
+    # Each order is a tuple (order_id, customer_id, item_details, delivery_address
+    # [, order_date[, status]]) or a dict with those keys. Orders without a date get
+    # today's date, looked up once for the whole batch.
+    def add_orders(self, orders):
+        today = datetime.date.today()
+        inserted = 0
+        duplicate_ids = []
+        verbose = self.verbose
+        self.verbose = False
+        try:
+            for order in orders:
+                new_node = OrderNode(*order_fields(order, today))
+                if self._add_node(new_node):
+                    inserted += 1
+                else:
+                    duplicate_ids.append(new_node.order_id)
+        finally:
+            self.verbose = verbose
+            if self.journal is not None:
+                self.journal.commit()
+        summary = {'inserted': inserted, 'duplicates': len(duplicate_ids), 'duplicate_ids': duplicate_ids}
+        self._log(f"Batch intake: {inserted} order(s) added, {len(duplicate_ids)} duplicate(s) skipped.")
+        return summary
+
     def _insert_binary_tree(self, current_node, new_node):
         #  Travel to left
         if new_node.order_id < current_node.order_id:
             if current_node.left is None:
                 current_node.left = new_node
-                print(f"Order {new_node.order_id} added left of {current_node.order_id}.")
+                self._log(f"Order {new_node.order_id} added left of {current_node.order_id}.")
                 return True
             else:
                 return self._insert_binary_tree(current_node.left, new_node)
@@ -49,31 +124,75 @@ class OrderBST:
         elif new_node.order_id > current_node.order_id:
             if current_node.right is None:
                 current_node.right = new_node
-                print(f"Order {new_node.order_id} added right of {current_node.order_id}.")
+                self._log(f"Order {new_node.order_id} added right of {current_node.order_id}.")
                 return True
             else:
                 return self._insert_binary_tree(current_node.right, new_node)
-        print(f"Insertion failed: Order ID {new_node.order_id} already exists.")
+        self._log(f"Insertion failed: Order ID {new_node.order_id} already exists.")
         return False
     
     def display_all_sorted(self):
         print("--- Displaying All Orders Sorted by ID ---")
-        if self.root is None:
+        empty = True
+        for order in self.iter_orders():
+            print(order)
+            empty = False
+        if empty:
             print("The order tree is currently empty.")
             return
-
-        self._in_order_traversal(self.root)
         print("------------------------------------------")
 
-    def _in_order_traversal(self, current_node):
-        if current_node is not None:
-            # Travel to left to find leftmost node
-            self._in_order_traversal(current_node.left)
-            
-            print(current_node)
+    # In-order cursor with an explicit stack, so a skewed tree cannot overflow the call stack.
+    # start_id seeks straight to the first order >= start_id (> start_id if not inclusive):
+    # only the O(log n) nodes on the search path are pushed, then each next() is amortised O(1).
+    # The tree must not be changed while a cursor is being consumed (take a page, then edit).
+    def iter_orders(self, start_id=None, inclusive=True):
+        stack = []
+        current_node = self.root
+        while current_node is not None:
+            if start_id is None or current_node.order_id > start_id or (inclusive and current_node.order_id == start_id):
+                stack.append(current_node)
+                current_node = current_node.left
+            else:
+                current_node = current_node.right # This node and its left subtree come before start_id
+
+        while stack:
+            current_node = stack.pop()
+            yield current_node
+            # Travel to right, then down to its leftmost node
+            current_node = current_node.right
+            while current_node is not None:
+                stack.append(current_node)
+                current_node = current_node.left
+
+    # One page of up to page_size orders, in O(log n + page_size).
+    # Pass the returned cursor back in to get the following page; it is None after the last page.
+    # A cursor stays valid across inserts and deletes because it only records the last order ID.
+    def get_page(self, page_size, cursor=None, start_id=None):
+        if not isinstance(page_size, int) or page_size < 1:
+            raise ValueError(f"Page size must be a positive whole number, got {page_size!r}")
+        if cursor is not None:
+            orders_iter = self.iter_orders(self._decode_cursor(cursor), inclusive=False)
+        else:
+            orders_iter = self.iter_orders(start_id)
+
+        page = []
+        for order in orders_iter:
+            if len(page) == page_size:
+                return page, self._encode_cursor(page[-1].order_id)
+            page.append(order)
+        return page, None
+
+    def _encode_cursor(self, order_id):
+        return base64.urlsafe_b64encode(json.dumps(order_id).encode('utf-8')).decode('ascii')
 
-            # Travel to right to continue print
-            self._in_order_traversal(current_node.right)
+    def _decode_cursor(self, cursor):
+        if not isinstance(cursor, str):
+            raise ValueError(f"Invalid page cursor: {cursor!r}")
+        try:
+            return json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except ValueError:
+            raise ValueError(f"Invalid page cursor: {cursor!r}")
             
     def find_order(self, order_id):
         return self._find_binary_tree(self.root, order_id)
@@ -94,28 +213,47 @@ class OrderBST:
         node_to_update = self.find_order(order_id)
 
         if node_to_update:
-            node_to_update.delivery_status = status
-            print(f"Status changed to '{status}' for order {order_id}.")
+            self.set_order_status(node_to_update, status)
+            self._log(f"Status changed to '{status}' for order {order_id}.")
             return True
         else:
-            print(f"Update failed: Order {order_id} not found for status update.")
+            self._log(f"Update failed: Order {order_id} not found for status update.")
             return False
 
+    # Status change for an order node already in hand (no tree lookup). Only the indexes
+    # that read delivery_status are refreshed.
+    def set_order_status(self, node, status):
+        if node.delivery_status == status:
+            return
+        affected = [index for index in self.indexes if 'delivery_status' in index.fields]
+        for index in affected:
+            index.remove(node)
+        node.delivery_status = status
+        for index in affected:
+            index.add(node)
+        if self.journal is not None:
+            self.journal.record_status(node.order_id, status)
+
     def delete_order(self, order_id):
-        target_order = self.find_order(order_id)
-        if target_order == None:
-            print(f"Order {order_id} not found.")
+        target_order = self._remove_node(order_id)
+        if target_order is None:
+            self._log(f"Order {order_id} not found.")
             return False
 
-        original_root = self.root
+        for index in self.indexes:
+            index.remove(target_order)
+        if self.journal is not None:
+            self.journal.record_delete(order_id)
+        self._log(f"Order {order_id} deleted successfully.")
+        return True
+
+    # Unlinks the order's node from the tree and returns it (None if the order is not there)
+    def _remove_node(self, order_id):
+        target_order = self.find_order(order_id)
+        if target_order is None:
+            return None
         self.root = self._delete_binary_tree(self.root, order_id)
-        
-        if self.root != original_root or self.find_order(order_id) is None:
-            print(f"Order {order_id} deleted successfully.")
-            return True
-        else:
-            print(f"Order {order_id} not found.")
-            return False
+        return target_order
 
     def _find_min_node(self, node):
         # Helper to find the smallest (leftmost) node in a given subtree
@@ -138,14 +276,960 @@ class OrderBST:
             if current_node.right is None:
                 return current_node.left  #  Returns the left child
 
+            # Two children: move the successor node itself into this position instead of
+            # copying its fields over, so every node keeps its own order and the node
+            # references held by the indexes stay valid.
             successor = self._find_min_node(current_node.right)
-            current_node.order_id = successor.order_id
-            current_node.customer_id = successor.customer_id
-            current_node.delivery_address = successor.delivery_address
-            current_node.item_details = successor.item_details
-            current_node.delivery_status = successor.delivery_status
-
-            current_node.right = self._delete_binary_tree(current_node.right, successor.order_id)
+            successor.right = self._remove_min_node(current_node.right)
+            successor.left = current_node.left
+            current_node.left = current_node.right = None
+            return successor
             
         return current_node
-        
\ No newline at end of file
+
+    def _remove_min_node(self, node):
+        # Unlinks the smallest node of a subtree and returns the subtree's new root
+        if node.left is None:
+            return node.right
+        parent = node
+        while parent.left.left is not None:
+            parent = parent.left
+        parent.left = parent.left.right
+        return node
+        
+
+class _SplayHeader:
+    # Temporary root of the left/right side trees built while splaying
+    __slots__ = ('left', 'right')
+
+    def __init__(self):
+        self.left = None
+        self.right = None
+
+
+class SplayOrderTree(OrderBST):
+    # Splay tree version of OrderBST with the same add/find/update/delete API.
+    # Every access moves the touched order to the root (top-down splaying, no recursion),
+    # so the few hundred orders that are looked up and updated over and over stay
+    # within a few steps of the root.
+
+    def _insert_node(self, new_node):
+        order_id = new_node.order_id
+        if self.root is None:
+            self.root = new_node
+            self._log(f"Order {order_id} added successfully.")
+            return True
+
+        self.root = self._splay(self.root, order_id)
+        if self.root.order_id == order_id:
+            self._log(f"Insertion failed: Order ID {order_id} already exists.")
+            return False
+
+        # Split the splayed tree around the new order, which becomes the root
+        if order_id < self.root.order_id:
+            new_node.left = self.root.left
+            new_node.right = self.root
+            self.root.left = None
+            self._log(f"Order {order_id} added left of {self.root.order_id}.")
+        else:
+            new_node.right = self.root.right
+            new_node.left = self.root
+            self.root.right = None
+            self._log(f"Order {order_id} added right of {self.root.order_id}.")
+        self.root = new_node
+        return True
+
+    def find_order(self, order_id):
+        if self.root is None:
+            return None
+        self.root = self._splay(self.root, order_id)
+        if self.root.order_id == order_id:
+            return self.root
+        return None
+
+    def _remove_node(self, order_id):
+        if self.find_order(order_id) is None:
+            return None
+
+        # The order is now the root: join its two subtrees
+        target = self.root
+        if target.left is None:
+            self.root = target.right
+        else:
+            # Splaying the left subtree for order_id brings its largest order up,
+            # which has no right child, so the right subtree can hang there
+            new_root = self._splay(target.left, order_id)
+            new_root.right = target.right
+            self.root = new_root
+        target.left = target.right = None
+        return target
+
+    def _splay(self, node, order_id):
+        # Top-down splay: walk down from node, hanging the parts passed on the left and right
+        # onto two side trees, then reassemble them around the last node reached.
+        header = _SplayHeader()
+        left_max = right_min = header
+        while True:
+            if order_id < node.order_id:
+                if node.left is None:
+                    break
+                if order_id < node.left.order_id:
+                    # Zig-zig: rotate right
+                    child = node.left
+                    node.left = child.right
+                    child.right = node
+                    node = child
+                    if node.left is None:
+                        break
+                right_min.left = node  # Link right
+                right_min = node
+                node = node.left
+            elif order_id > node.order_id:
+                if node.right is None:
+                    break
+                if order_id > node.right.order_id:
+                    # Zag-zag: rotate left
+                    child = node.right
+                    node.right = child.left
+                    child.left = node
+                    node = child
+                    if node.right is None:
+                        break
+                left_max.right = node  # Link left
+                left_max = node
+                node = node.right
+            else:
+                break
+
+        # Assemble
+        left_max.right = node.left
+        right_min.left = node.right
+        node.left = header.right
+        node.right = header.left
+        return node
+
+
+class BlockOrderStore(OrderBST):
+    # Order store for order IDs that mostly arrive in increasing order, with the same
+    # add/find/update/delete/paging API as OrderBST. Orders live in a list of sorted
+    # blocks of at most BLOCK_SIZE orders; block_mins holds each block's smallest ID.
+    #   - a new largest ID is appended to the last block (the rightmost-block hint), or
+    #     starts a new block when that one is full: amortised O(1), no search at all
+    #   - any other insert, find or delete is a binary search over block_mins and then
+    #     inside one block: O(log n), plus an O(BLOCK_SIZE) list shift
+    # Blocks filled by appends stay full; a block that overflows from an out-of-order
+    # insert is split in half. Empty blocks are dropped.
+    BLOCK_SIZE = 512
+
+    def __init__(self):
+        super().__init__()
+        self.block_mins = []  # smallest order ID of each block, ascending
+        self.block_ids = []   # per block: its order IDs, ascending
+        self.blocks = []      # per block: the OrderNodes, in the same order as block_ids
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def _insert_node(self, new_node):
+        order_id = new_node.order_id
+        # Append fast path: new largest ID
+        if not self.blocks or order_id > self.block_ids[-1][-1]:
+            if self.blocks and len(self.blocks[-1]) < self.BLOCK_SIZE:
+                self.block_ids[-1].append(order_id)
+                self.blocks[-1].append(new_node)
+            else:
+                self.block_mins.append(order_id)
+                self.block_ids.append([order_id])
+                self.blocks.append([new_node])
+            self.count += 1
+            self._log(f"Order {order_id} added successfully.")
+            return True
+
+        block = max(bisect.bisect_right(self.block_mins, order_id) - 1, 0)
+        ids = self.block_ids[block]
+        position = bisect.bisect_left(ids, order_id)
+        if position < len(ids) and ids[position] == order_id:
+            self._log(f"Insertion failed: Order ID {order_id} already exists.")
+            return False
+        ids.insert(position, order_id)
+        self.blocks[block].insert(position, new_node)
+        self.block_mins[block] = ids[0]
+        if len(ids) > self.BLOCK_SIZE:
+            half = len(ids) // 2
+            self.block_ids.insert(block + 1, ids[half:])
+            self.blocks.insert(block + 1, self.blocks[block][half:])
+            self.block_mins.insert(block + 1, ids[half])
+            del ids[half:]
+            del self.blocks[block][half:]
+        self.count += 1
+        self._log(f"Order {order_id} added successfully.")
+        return True
+
+    # (block, position) of order_id, or None
+    def _locate(self, order_id):
+        block = bisect.bisect_right(self.block_mins, order_id) - 1
+        if block < 0:
+            return None
+        ids = self.block_ids[block]
+        position = bisect.bisect_left(ids, order_id)
+        if position < len(ids) and ids[position] == order_id:
+            return block, position
+        return None
+
+    def find_order(self, order_id):
+        location = self._locate(order_id)
+        if location is None:
+            return None
+        return self.blocks[location[0]][location[1]]
+
+    def _remove_node(self, order_id):
+        location = self._locate(order_id)
+        if location is None:
+            return None
+        block, position = location
+        ids = self.block_ids[block]
+        del ids[position]
+        target = self.blocks[block].pop(position)
+        if ids:
+            self.block_mins[block] = ids[0]
+        else:
+            del self.block_mins[block]
+            del self.block_ids[block]
+            del self.blocks[block]
+        self.count -= 1
+        return target
+
+    def iter_orders(self, start_id=None, inclusive=True):
+        if start_id is None:
+            block, position = 0, 0
+        else:
+            block = max(bisect.bisect_right(self.block_mins, start_id) - 1, 0)
+            position = 0
+            if block < len(self.blocks):
+                search = bisect.bisect_left if inclusive else bisect.bisect_right
+                position = search(self.block_ids[block], start_id)
+
+        while block < len(self.blocks):
+            yield from self.blocks[block][position:]
+            block += 1
+            position = 0
+
+
+class CustomerOrderIndex:
+    # Secondary index: customer_id -> that customer's orders, oldest first.
+    # Each customer's list holds (order_date, order_id, node) tuples kept sorted with bisect;
+    # order_id is unique, so tuples never compare the nodes themselves.
+
+    def __init__(self):
+        self.fields = {'customer_id', 'order_date'}
+        self.orders_by_customer = {}
+
+    def add(self, node):
+        orders = self.orders_by_customer.setdefault(node.customer_id, [])
+        bisect.insort(orders, (node.order_date, node.order_id, node))
+
+    def remove(self, node):
+        orders = self.orders_by_customer.get(node.customer_id)
+        if not orders:
+            return
+        position = bisect.bisect_left(orders, (node.order_date, node.order_id))
+        if position < len(orders) and orders[position][1] == node.order_id:
+            del orders[position]
+        if not orders:
+            del self.orders_by_customer[node.customer_id]
+
+    # All orders of one customer ordered by order_date (then order ID)
+    def history(self, customer_id, newest_first=False):
+        orders = [entry[2] for entry in self.orders_by_customer.get(customer_id, ())]
+        if newest_first:
+            orders.reverse()
+        return orders
+
+
+class DeliveryStatusIndex:
+    # Secondary index: delivery status -> orders in that status, each bucket a dict keyed by
+    # order ID so moving an order between statuses is O(1).
+    # Pending orders are also kept in a dispatch queue: one FIFO bucket per order_date plus a
+    # sorted list of the dates that have pending orders, so the next N orders to dispatch
+    # come out oldest first without scanning the tree.
+
+    def __init__(self, pending_status='Pending'):
+        self.fields = {'delivery_status'}
+        self.pending_status = pending_status
+        self.buckets = {}
+        self.pending_by_date = {}  # order_date -> {order_id: node} in arrival order
+        self.pending_dates = []    # sorted dates that have pending orders
+
+    def add(self, node):
+        self.buckets.setdefault(node.delivery_status, {})[node.order_id] = node
+        if node.delivery_status == self.pending_status:
+            day = self.pending_by_date.get(node.order_date)
+            if day is None:
+                day = self.pending_by_date[node.order_date] = {}
+                bisect.insort(self.pending_dates, node.order_date)
+            day[node.order_id] = node
+
+    def remove(self, node):
+        bucket = self.buckets.get(node.delivery_status)
+        if bucket is not None:
+            bucket.pop(node.order_id, None)
+            if not bucket:
+                del self.buckets[node.delivery_status]
+        if node.delivery_status == self.pending_status:
+            day = self.pending_by_date.get(node.order_date)
+            if day is not None:
+                day.pop(node.order_id, None)
+                if not day:
+                    del self.pending_by_date[node.order_date]
+                    del self.pending_dates[bisect.bisect_left(self.pending_dates, node.order_date)]
+
+    def orders_with_status(self, status):
+        return list(self.buckets.get(status, {}).values())
+
+    def counts(self):
+        return {status: len(bucket) for status, bucket in self.buckets.items()}
+
+    # The next `count` pending orders, oldest order_date first (arrival order within a day)
+    def next_pending(self, count):
+        result = []
+        for order_date in self.pending_dates:
+            for node in self.pending_by_date[order_date].values():
+                if len(result) == count:
+                    return result
+                result.append(node)
+        return result
+
+    # Dispatch loop step: takes the next `count` pending orders and moves them to new_status
+    # through the tree, so every other index sees the change too.
+    def pull_pending(self, order_tree, count, new_status='In Transit'):
+        orders = self.next_pending(count)
+        for node in orders:
+            order_tree.set_order_status(node, new_status)
+        return orders
+
+
+# item_details comes in a few shapes: one ('Laptop', 3) pair, a sequence of such pairs,
+# or a {'Laptop': 3} mapping. Returns a list of (item, quantity) pairs for all of them.
+def order_lines(item_details):
+    if not item_details:
+        return []
+    if isinstance(item_details, dict):
+        return list(item_details.items())
+    if (len(item_details) == 2 and isinstance(item_details[0], str)
+            and isinstance(item_details[1], int)):
+        return [(item_details[0], item_details[1])]
+    return [(line[0], line[1]) for line in item_details]
+
+
+class OrderDateIndex:
+    # Secondary index: order_date -> orders placed that day, plus the sorted list of dates,
+    # so "orders between two dates" is a binary search and a walk over the k results.
+    # Each day also keeps a running rollup (order count and quantity per product) that
+    # add/remove adjust, so daily sales reports never traverse the order tree.
+
+    def __init__(self):
+        self.fields = {'order_date', 'item_details'}
+        self.orders_by_date = {}  # order_date -> {order_id: node}
+        self.dates = []           # sorted dates that have orders
+        self.rollups = {}         # order_date -> {'orders': n, 'items': {product: quantity}}
+
+    def add(self, node):
+        day = self.orders_by_date.get(node.order_date)
+        if day is None:
+            day = self.orders_by_date[node.order_date] = {}
+            bisect.insort(self.dates, node.order_date)
+            self.rollups[node.order_date] = {'orders': 0, 'items': {}}
+        day[node.order_id] = node
+
+        rollup = self.rollups[node.order_date]
+        rollup['orders'] += 1
+        for item, quantity in order_lines(node.item_details):
+            rollup['items'][item] = rollup['items'].get(item, 0) + quantity
+
+    def remove(self, node):
+        day = self.orders_by_date.get(node.order_date)
+        if day is None or day.pop(node.order_id, None) is None:
+            return
+
+        rollup = self.rollups[node.order_date]
+        rollup['orders'] -= 1
+        for item, quantity in order_lines(node.item_details):
+            remaining = rollup['items'].get(item, 0) - quantity
+            if remaining:
+                rollup['items'][item] = remaining
+            else:
+                rollup['items'].pop(item, None)
+
+        if not day:
+            del self.orders_by_date[node.order_date]
+            del self.rollups[node.order_date]
+            del self.dates[bisect.bisect_left(self.dates, node.order_date)]
+
+    # Orders placed between start and end (inclusive; None leaves that side open), by date
+    def between(self, start=None, end=None):
+        low = 0 if start is None else bisect.bisect_left(self.dates, start)
+        high = len(self.dates) if end is None else bisect.bisect_right(self.dates, end)
+        for order_date in self.dates[low:high]:
+            yield from self.orders_by_date[order_date].values()
+
+    # {'orders': n, 'items': {product: quantity}} for one day
+    def daily_report(self, order_date):
+        rollup = self.rollups.get(order_date, {'orders': 0, 'items': {}})
+        return {'orders': rollup['orders'], 'items': dict(rollup['items'])}
+
+    # Per-day rollups for a date range, plus their total: {'days': {...}, 'total': {...}}
+    def sales_report(self, start=None, end=None):
+        low = 0 if start is None else bisect.bisect_left(self.dates, start)
+        high = len(self.dates) if end is None else bisect.bisect_right(self.dates, end)
+        days = {}
+        total = {'orders': 0, 'items': {}}
+        for order_date in self.dates[low:high]:
+            days[order_date] = self.daily_report(order_date)
+            total['orders'] += days[order_date]['orders']
+            for item, quantity in days[order_date]['items'].items():
+                total['items'][item] = total['items'].get(item, 0) + quantity
+        return {'days': days, 'total': total}
+
+
+# Region key for a free-text delivery address: its (last) 5-digit postcode if it has one,
+# otherwise the last comma-separated part with digits and punctuation dropped, e.g.
+#   "12, Jalan Mawar, 81300 Skudai" -> "81300"
+#   "111, First Town"               -> "first town"
+#   "789 Taman Durian"              -> "taman durian"
+_POSTCODE = re.compile(r'\b\d{5}\b')
+
+def region_key(address):
+    postcodes = _POSTCODE.findall(address)
+    if postcodes:
+        return postcodes[-1]  # the postcode comes after any house or lot number
+    parts = [part for part in address.split(',') if part.strip()]
+    words = re.findall(r'[a-z]+', parts[-1].lower()) if parts else []
+    return ' '.join(words) or 'unknown'
+
+
+class RegionDispatchIndex:
+    # Secondary index over pending orders only: region key -> {order_id: (node, quantity)}
+    # in arrival order, plus the total pending quantity per region. Quantities come from
+    # item_details and are computed once when the order enters the index, so planning the
+    # day's truck runs is one pass over the pending orders, never a tree scan.
+
+    def __init__(self, pending_status='Pending', key=region_key):
+        self.fields = {'delivery_status', 'delivery_address', 'item_details'}
+        self.pending_status = pending_status
+        self.key = key
+        self.pending_by_region = {}
+        self.region_quantity = {}
+
+    def add(self, node):
+        if node.delivery_status != self.pending_status:
+            return
+        region = self.key(node.delivery_address)
+        quantity = sum(quantity for _, quantity in order_lines(node.item_details))
+        self.pending_by_region.setdefault(region, {})[node.order_id] = (node, quantity)
+        self.region_quantity[region] = self.region_quantity.get(region, 0) + quantity
+
+    def remove(self, node):
+        if node.delivery_status != self.pending_status:
+            return
+        region = self.key(node.delivery_address)
+        orders = self.pending_by_region.get(region)
+        if orders is None or node.order_id not in orders:
+            return
+        _, quantity = orders.pop(node.order_id)
+        self.region_quantity[region] -= quantity
+        if not orders:
+            del self.pending_by_region[region]
+            del self.region_quantity[region]
+
+    # Dispatch batches for the pending orders of `regions` (default: all), each at most
+    # `capacity` items and from a single region. Orders keep their arrival order and fill
+    # the current truck until the next one does not fit; an order larger than a whole
+    # truck goes out on its own. Returns [{'region', 'orders': [node, ...], 'quantity'}].
+    def plan_batches(self, capacity, regions=None):
+        if capacity <= 0:
+            raise ValueError("Truck capacity must be positive")
+        batches = []
+        for region in (regions if regions is not None else sorted(self.pending_by_region)):
+            batch = None
+            for node, quantity in self.pending_by_region.get(region, {}).values():
+                if batch is None or batch['quantity'] + quantity > capacity:
+                    batch = {'region': region, 'orders': [], 'quantity': 0}
+                    batches.append(batch)
+                batch['orders'].append(node)
+                batch['quantity'] += quantity
+        return batches
+
+    # Plans the batches and moves their orders to new_status through the tree (which drops
+    # them from this index). max_batches limits how many trucks go out now.
+    def pull_batches(self, order_tree, capacity, max_batches=None, regions=None, new_status='In Transit'):
+        batches = self.plan_batches(capacity, regions)
+        if max_batches is not None:
+            batches = batches[:max_batches]
+        for batch in batches:
+            for node in batch['orders']:
+                order_tree.set_order_status(node, new_status)
+        return batches
+
+
+# Stock reservation against the inventory module's FurnitureBST (anything with
+# search(sku) -> item and update_item(item, quantity=...) works). Reserving takes the
+# ordered quantity off the item's stock, so a reserved unit can never be sold twice.
+#
+# A batch is checked in one pass against a per-SKU running balance: an order is reserved
+# only if every one of its lines fits, otherwise none of them are (the order is rejected
+# with a reason). The new balances are then written back once per SKU, so an inventory
+# node is touched at most once per batch however many orders share it. If a write fails
+# part way, the SKUs already written are restored and no order in the batch is reserved.
+# sku_for maps an item_details name to its SKU; by default the name is the SKU.
+#
+# Durability: pass apply_movements (a callable taking a list of (kind, sku, quantity)
+# stock movements, e.g. a wrapper around the inventory module's apply_movements() with
+# its MovementLog) and each batch's balances go in as one logged 'adjust' batch, so
+# reservations survive a crash. Without it the balances are set with update_item()
+# directly and only last as long as the inventory tree, or until its next snapshot.
+
+class StockReservations:
+    def __init__(self, inventory, sku_for=None, apply_movements=None):
+        self.inventory = inventory
+        self.sku_for = sku_for or (lambda item: item)
+        self.apply_movements = apply_movements
+        self.reservations = {}  # order_id -> {sku: quantity}
+
+    # orders are OrderNodes or the tuples/dicts accepted by add_orders().
+    # Returns {'reserved': [order_id, ...], 'positions': [index in orders, ...],
+    #          'rejected': [(order_id, reason), ...]}.
+    def reserve(self, orders):
+        items = {}      # sku -> inventory item (None when unknown)
+        balances = {}   # sku -> stock left after the orders accepted so far
+        accepted = []   # (order_id, {sku: quantity})
+        positions = []  # index in `orders` of each accepted order
+        rejected = []
+        batch_ids = set()
+        for position, order in enumerate(orders):
+            order_id, item_details = _order_id_and_items(order)
+            if order_id in self.reservations or order_id in batch_ids:
+                rejected.append((order_id, 'already reserved'))
+                continue
+
+            demand = {}
+            for item_name, quantity in order_lines(item_details):
+                sku = self.sku_for(item_name)
+                demand[sku] = demand.get(sku, 0) + quantity
+
+            reason = None
+            for sku, quantity in demand.items():
+                if sku not in items:
+                    items[sku] = self.inventory.search(sku)
+                    if items[sku] is not None:
+                        balances[sku] = items[sku].quantity
+                if quantity <= 0:
+                    reason = f"{sku}: quantity must be positive"
+                elif items[sku] is None:
+                    reason = f"{sku}: unknown SKU"
+                elif balances[sku] < quantity:
+                    reason = f"{sku}: insufficient stock ({balances[sku]} available, {quantity} ordered)"
+                if reason:
+                    break
+            if reason:
+                rejected.append((order_id, reason))
+                continue
+
+            for sku, quantity in demand.items():
+                balances[sku] -= quantity
+            accepted.append((order_id, demand))
+            positions.append(position)
+            batch_ids.add(order_id)
+
+        touched = {sku for _, demand in accepted for sku in demand}
+        self._write_balances({sku: (items[sku], balances[sku]) for sku in touched})
+        for order_id, demand in accepted:
+            self.reservations[order_id] = demand
+        return {'reserved': [order_id for order_id, _ in accepted], 'positions': positions,
+                'rejected': rejected}
+
+    # Cancels reservations and puts their stock back, again one write per SKU.
+    # Returns the order ids that had a reservation.
+    def release(self, order_ids):
+        returned = {}
+        released = []
+        for order_id in order_ids:
+            demand = self.reservations.get(order_id)
+            if demand is None:
+                continue
+            released.append(order_id)
+            for sku, quantity in demand.items():
+                returned[sku] = returned.get(sku, 0) + quantity
+
+        updates = {}
+        for sku, quantity in returned.items():
+            item = self.inventory.search(sku)
+            if item is not None:
+                updates[sku] = (item, item.quantity + quantity)
+        self._write_balances(updates)
+        for order_id in released:
+            del self.reservations[order_id]
+        return released
+
+    # Reserves stock for a batch and adds the orders that got it to order_tree.
+    # Reservations of orders the tree refuses (duplicate ids) are released again, and if
+    # adding fails altogether every reservation of the batch is released before re-raising.
+    # Returns the add_orders() summary plus the reserve() 'rejected' list.
+    def place_orders(self, order_tree, orders):
+        orders = [_order_fields_of(order) if isinstance(order, OrderNode) else order
+                  for order in orders]
+        result = self.reserve(orders)
+        try:
+            # Only the copies that were reserved: a repeated order ID in the batch was
+            # rejected by reserve() and must not reach the tree
+            summary = order_tree.add_orders(orders[position] for position in result['positions'])
+        except Exception:
+            self.release(result['reserved'])
+            raise
+        # Each reserved ID was added once, so these are orders the tree already had
+        self.release(summary['duplicate_ids'])
+        summary['rejected'] = result['rejected']
+        return summary
+
+    # updates: sku -> (item, new quantity). All or nothing.
+    def _write_balances(self, updates):
+        if self.apply_movements is not None:
+            self._adjust_through_movements(updates)
+            return
+        written = []
+        try:
+            for item, quantity in updates.values():
+                previous = item.quantity
+                self.inventory.update_item(item, quantity=quantity)
+                written.append((item, previous))
+        except Exception:
+            for item, previous in reversed(written):
+                self.inventory.update_item(item, quantity=previous)
+            raise
+
+    # One logged 'adjust' batch; if any of it is rejected the rest is adjusted back
+    def _adjust_through_movements(self, updates):
+        movements = [('adjust', sku, quantity - item.quantity)
+                     for sku, (item, quantity) in updates.items() if quantity != item.quantity]
+        if not movements:
+            return
+        result = self.apply_movements(movements)
+        if result['rejected']:
+            rejected = {movement[1] for movement, _ in result['rejected']}
+            undo = [('adjust', sku, -change) for _, sku, change in movements if sku not in rejected]
+            if undo:
+                self.apply_movements(undo)
+            raise ValueError(f"Stock reservation rejected by inventory: {result['rejected']}")
+
+def _order_fields_of(node):
+    return (node.order_id, node.customer_id, node.item_details, node.delivery_address,
+            node.order_date, node.delivery_status)
+
+def _order_id_and_items(order):
+    if isinstance(order, OrderNode):
+        return order.order_id, order.item_details
+    if isinstance(order, dict):
+        return order['order_id'], order['item_details']
+    return order[0], order[2]
+
+
+# Durable order journal. Every add, status change and delete made through an OrderBST
+# with a journal attached is appended to the journal file as one JSON line:
+#   {"seq": 7, "op": "add", "order": [order_id, customer_id, items, address, date, status]}
+#   {"seq": 8, "op": "status", "order_id": 30, "status": "Delivered"}
+#   {"seq": 9, "op": "delete", "order_id": 30}
+# Group commit: lines are buffered and written with one write and one fsync when
+# group_size changes are pending, at the end of every add_orders() batch, on
+# commit()/close(), or when a timer started by the first pending change fires
+# commit_interval seconds later. So a lone add_order, update_order_status or
+# delete_order is durable at most commit_interval seconds after it returns (call
+# commit() to wait for it), and a crash can lose at most that window of changes.
+# A change is durable once the commit that covers it has returned.
+#
+# Compaction folds the checkpoint and the committed journal into a sorted snapshot
+# (<journal>.snap: a header line, then one order per line by order ID) and cuts the
+# journal down to the changes made since. It runs in a background thread once the
+# journal grows past compact_bytes, and reads only the files, never the live tree.
+# Recovery (open) loads the snapshot and replays the journal entries newer than it;
+# a torn last line from a crash mid-write is cut off.
+
+SNAPSHOT_FORMAT = 1
+
+class OrderJournal:
+    def __init__(self, filename, group_size=256, commit_interval=0.05, compact_bytes=16 * 1024 * 1024):
+        self.filename = filename
+        self.snapshot_filename = filename + '.snap'
+        self.group_size = group_size
+        self.commit_interval = commit_interval
+        self.compact_bytes = compact_bytes
+        self.sequence = 0
+        self.commits = 0        # number of fsyncs, for checking that commits are grouped
+        self._pending = []      # encoded lines not yet written
+        self._pending_since = 0.0
+        self._file = None
+        self._lock = threading.RLock()
+        self._compaction = None # running compaction thread, if any
+        self._timer = None      # commit_interval timer armed by the first pending change
+
+    # Recovers the tree from snapshot + journal, then attaches the journal to it.
+    # Returns the number of journal entries replayed on top of the snapshot.
+    def open(self, order_tree):
+        verbose = order_tree.verbose
+        order_tree.verbose = False
+        order_tree.journal = None
+        try:
+            snapshot_sequence, orders = self._read_snapshot()
+            if not isinstance(order_tree, BlockOrderStore):
+                # Sorted intake would turn a plain BST into a chain
+                orders = _balanced_order(orders)
+            order_tree.add_orders(orders)
+            self.sequence = snapshot_sequence
+            replayed = 0
+            for entry in self._read_journal(truncate_torn=True):
+                self.sequence = max(self.sequence, entry['seq'])
+                if entry['seq'] > snapshot_sequence:
+                    _replay_entry(order_tree, entry)
+                    replayed += 1
+        finally:
+            order_tree.verbose = verbose
+        order_tree.journal = self
+        return replayed
+
+    def record_add(self, node):
+        self._record({'op': 'add', 'order': _encode_order(node)})
+
+    def record_status(self, order_id, status):
+        self._record({'op': 'status', 'order_id': order_id, 'status': status})
+
+    def record_delete(self, order_id):
+        self._record({'op': 'delete', 'order_id': order_id})
+
+    def _record(self, entry):
+        with self._lock:
+            self.sequence += 1
+            entry['seq'] = self.sequence
+            if not self._pending:
+                self._pending_since = time.monotonic()
+                if self._timer is None:
+                    self._timer = threading.Timer(self.commit_interval, self._timed_commit)
+                    self._timer.daemon = True
+                    self._timer.start()
+            self._pending.append(json.dumps(entry, separators=(',', ':')).encode('utf-8') + b'\n')
+            if (len(self._pending) >= self.group_size
+                    or time.monotonic() - self._pending_since >= self.commit_interval):
+                self.commit()
+
+    def _timed_commit(self):
+        with self._lock:
+            if self._timer is threading.current_thread():
+                self._timer = None
+            self.commit()
+
+    # Writes and fsyncs every pending change; returns the last durable sequence number
+    def commit(self):
+        with self._lock:
+            if self._pending:
+                if self._file is None:
+                    self._file = open(self.filename, 'ab')
+                self._file.write(b''.join(self._pending))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._pending = []
+                self.commits += 1
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if self._file.tell() >= self.compact_bytes:
+                    self.compact_in_background()
+            return self.sequence
+
+    def compact_in_background(self):
+        with self._lock:
+            if self._compaction is not None and self._compaction.is_alive():
+                return self._compaction
+            self._compaction = threading.Thread(target=self.compact, name='order-journal-compaction', daemon=True)
+            self._compaction.start()
+            return self._compaction
+
+    # Rewrites snapshot + committed journal into a new sorted snapshot and drops the
+    # journal entries it now covers. Safe to run while changes keep being recorded.
+    def compact(self):
+        with self._lock:
+            self.commit()
+            journal_end = os.path.getsize(self.filename) if os.path.exists(self.filename) else 0
+
+        snapshot_sequence, orders = self._read_snapshot()
+        state = {order[0]: order for order in orders}
+        for entry in self._read_journal(end=journal_end):
+            if entry['seq'] <= snapshot_sequence:
+                continue
+            snapshot_sequence = entry['seq']
+            if entry['op'] == 'add':
+                order = _decode_order(entry['order'])
+                state.setdefault(order[0], order)
+            elif entry['op'] == 'status':
+                if entry['order_id'] in state:
+                    state[entry['order_id']] = state[entry['order_id']][:5] + (entry['status'],)
+            elif entry['op'] == 'delete':
+                state.pop(entry['order_id'], None)
+
+        temp_filename = self.snapshot_filename + '.tmp'
+        with open(temp_filename, 'wb') as file:
+            header = {'format': SNAPSHOT_FORMAT, 'seq': snapshot_sequence, 'count': len(state)}
+            file.write(json.dumps(header).encode('utf-8') + b'\n')
+            for order_id in sorted(state):
+                file.write(json.dumps(_encode_order(state[order_id]), separators=(',', ':')).encode('utf-8') + b'\n')
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_filename, self.snapshot_filename)
+
+        # Keep only what was appended while the snapshot was being written
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            tail = b''
+            if os.path.exists(self.filename):
+                with open(self.filename, 'rb') as file:
+                    file.seek(journal_end)
+                    tail = file.read()
+            temp_filename = self.filename + '.tmp'
+            with open(temp_filename, 'wb') as file:
+                file.write(tail)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_filename, self.filename)
+        return snapshot_sequence
+
+    def close(self):
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+        with self._lock:
+            self.commit()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # (sequence, [order tuple, ...]) from the snapshot; (0, []) if there is none yet
+    def _read_snapshot(self):
+        try:
+            file = open(self.snapshot_filename, 'rb')
+        except FileNotFoundError:
+            return 0, []
+        with file:
+            header = json.loads(file.readline())
+            if header.get('format') != SNAPSHOT_FORMAT:
+                raise ValueError(f"Unsupported order snapshot format: {header.get('format')!r}")
+            orders = [_decode_order(json.loads(line)) for line in file]
+        if len(orders) != header['count']:
+            raise ValueError(f"Order snapshot {self.snapshot_filename} is incomplete")
+        return header['seq'], orders
+
+    # Journal entries in order, up to byte offset `end` (default: the whole file)
+    def _read_journal(self, end=None, truncate_torn=False):
+        try:
+            file = open(self.filename, 'rb')
+        except FileNotFoundError:
+            return
+        good_end = 0
+        with file:
+            for line in file:
+                if end is not None and good_end >= end:
+                    break
+                try:
+                    entry = json.loads(line)
+                    entry['seq']
+                except (ValueError, KeyError, TypeError):
+                    break
+                good_end += len(line)
+                yield entry
+            torn = end is None and os.fstat(file.fileno()).st_size > good_end
+        if torn and truncate_torn:
+            with open(self.filename, 'r+b') as file:
+                file.truncate(good_end)
+
+# Sorted orders re-ordered median first (breadth first over the halves), so inserting
+# them one by one into an unbalanced BST gives a balanced tree
+def _balanced_order(orders):
+    result = []
+    ranges = collections.deque([(0, len(orders))])
+    while ranges:
+        low, high = ranges.popleft()
+        if low < high:
+            middle = (low + high) // 2
+            result.append(orders[middle])
+            ranges.append((low, middle))
+            ranges.append((middle + 1, high))
+    return result
+
+def _replay_entry(order_tree, entry):
+    if entry['op'] == 'add':
+        order_tree.add_order(*_decode_order(entry['order']))
+    elif entry['op'] == 'status':
+        order_tree.update_order_status(entry['order_id'], entry['status'])
+    elif entry['op'] == 'delete':
+        order_tree.delete_order(entry['order_id'])
+
+# OrderNode or order tuple -> JSON-ready list
+def _encode_order(order):
+    if isinstance(order, OrderNode):
+        order = (order.order_id, order.customer_id, order.item_details,
+                 order.delivery_address, order.order_date, order.delivery_status)
+    order_id, customer_id, item_details, delivery_address, order_date, status = order
+    return [order_id, customer_id, item_details, delivery_address, order_date.isoformat(), status]
+
+# Inverse of _encode_order. JSON turns tuples into lists, so item_details is given back
+# its tuple shape: one (item, quantity) pair, or a tuple of pairs (a mapping stays a dict).
+def _decode_order(record):
+    order_id, customer_id, item_details, delivery_address, order_date, status = record
+    if isinstance(item_details, list):
+        if (len(item_details) == 2 and isinstance(item_details[0], str)
+                and isinstance(item_details[1], int)):
+            item_details = tuple(item_details)
+        else:
+            item_details = tuple(tuple(line) for line in item_details)
+    return (order_id, customer_id, item_details, delivery_address,
+            datetime.date.fromisoformat(order_date), status)
+
+
+# Order stream readers for add_orders(). Both yield
+# (order_id, customer_id, item_details, delivery_address, order_date, status) tuples.
+#
+# CSV header: order_id,customer_id,items,delivery_address,order_date,status
+#   items is "Chair:2;Table:1", order_date is yyyy-mm-dd (both optional columns may be blank)
+# JSONL: one object per line with the same keys; items may also be [["Chair", 2], ...]
+
+def parse_items(text):
+    lines = []
+    for part in text.split(';'):
+        if not part.strip():
+            continue
+        name, _, quantity = part.rpartition(':')
+        if not name:
+            name, quantity = quantity, '1'
+        lines.append((name.strip(), int(quantity)))
+    return tuple(lines)
+
+# One CSV row or JSON object -> order tuple. IDs are converted with int(), since CSV gives
+# strings; callers taking untrusted JSON should check the ID types first.
+def order_from_record(record):
+    items = record.get('items', record.get('item_details', ()))
+    if isinstance(items, str):
+        items = parse_items(items)
+    else:
+        items = tuple(tuple(line) for line in items)
+    order_date = record.get('order_date') or None
+    if isinstance(order_date, str):
+        order_date = datetime.date.fromisoformat(order_date)
+    return (int(record['order_id']), int(record['customer_id']), items,
+            record['delivery_address'], order_date, record.get('status') or 'Pending')
+
+def read_orders_csv(stream):
+    for record in csv.DictReader(stream):
+        yield order_from_record(record)
+
+def read_orders_jsonl(stream):
+    for line in stream:
+        if line.strip():
+            yield order_from_record(json.loads(line))
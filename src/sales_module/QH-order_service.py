@@ -0,0 +1,284 @@
+# Asyncio order-intake service in front of one order tree.
+#
+# Producers (in-process coroutines, or clients on a local socket) submit add and status
+# requests into a bounded queue; when it is full, submit() waits, which pushes back on
+# the producers instead of letting the backlog grow without limit. A single writer
+# coroutine takes requests off the queue in micro-batches of up to batch_size and applies
+# each batch to the tree without yielding to the event loop, so other coroutines see
+# either none of a batch or all of it. A request that fails only fails its own
+# submitter; the rest of the batch is still applied. When a journal is attached the
+# batch is committed with one fsync before its requests are acknowledged.
+#
+# Reads (find, page) run directly on the event loop between batches,
+# so they always see the state after some whole number of batches, never half of one.
+# They return plain tuples rather than OrderNodes, so a caller holding a result across
+# an await never sees it change underneath it.
+#
+# Socket protocol: one JSON object per line, one JSON reply per line.
+#   {"op": "add", "order": {"order_id": 1, "customer_id": 7, "items": "Chair:2",
+#                           "delivery_address": "...", "order_date": "2025-01-31"}}
+#   {"op": "status", "order_id": 1, "status": "Delivered"}
+#   {"op": "get", "order_id": 1}
+#   {"op": "page", "page_size": 50, "cursor": null}
+#
+# Examples:
+#   python QH-order_service.py --producers 100 --orders 200000      # in-process load test
+#   python QH-order_service.py --serve --port 8750 --journal orders.journal
+
+import argparse
+import asyncio
+import datetime
+import importlib.util
+import json
+import os
+import sys
+import time
+
+# QH-order_bst.py has a dash in its name, so it is loaded from its path
+_MODULE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'QH-order_bst.py')
+_spec = importlib.util.spec_from_file_location('qh_order_bst', _MODULE_PATH)
+order_bst = importlib.util.module_from_spec(_spec)
+sys.modules['qh_order_bst'] = order_bst
+_spec.loader.exec_module(order_bst)
+
+TREES = {'bst': order_bst.OrderBST, 'splay': order_bst.SplayOrderTree, 'block': order_bst.BlockOrderStore}
+
+
+def order_record(node):
+    return (node.order_id, node.customer_id, node.item_details, node.delivery_address,
+            node.order_date, node.delivery_status)
+
+
+class OrderIntakeService:
+    def __init__(self, order_tree, queue_size=10000, batch_size=512):
+        self.order_tree = order_tree
+        self.order_tree.verbose = False
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.queue = None
+        self.batches = 0   # micro-batches applied so far
+        self.applied = 0   # requests applied so far
+        self._writer = None
+
+    async def start(self):
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self._writer = asyncio.create_task(self._write_loop())
+
+    # Waits until everything already submitted has been applied, then stops the writer
+    async def stop(self):
+        await self.queue.join()
+        self._writer.cancel()
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+        if self.order_tree.journal is not None:
+            self.order_tree.journal.commit()
+
+    # Queues an add; resolves to True once the order is in the tree (and durable, when a
+    # journal is attached), False if the order ID already exists.
+    async def submit_add(self, order):
+        return await self._submit('add', order)
+
+    # Queues a status change; resolves to False if the order does not exist
+    async def submit_status(self, order_id, status):
+        return await self._submit('status', (order_id, status))
+
+    async def _submit(self, kind, payload):
+        done = asyncio.get_running_loop().create_future()
+        await self.queue.put((kind, payload, done))
+        return await done
+
+    async def _write_loop(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                outcomes = self._apply_batch(batch)
+            except Exception as error:
+                # Only the journal commit can get here: nothing in the batch is durable
+                outcomes = [(None, error)] * len(batch)
+            for (_, _, done), (result, error) in zip(batch, outcomes):
+                if done.done():
+                    continue
+                if error is not None:
+                    done.set_exception(error)
+                else:
+                    done.set_result(result)
+            for _ in batch:
+                self.queue.task_done()
+
+    # Applies one micro-batch in request order; no await, so no reader sees it half done.
+    # Returns one (result, error) pair per request. The journal is committed once for
+    # everything that was applied.
+    def _apply_batch(self, batch):
+        tree = self.order_tree
+        today = datetime.date.today()
+        outcomes = []
+        for kind, payload, _ in batch:
+            try:
+                if kind == 'add':
+                    outcomes.append((tree.add_order(*order_bst.order_fields(payload, today)), None))
+                else:
+                    outcomes.append((tree.update_order_status(*payload), None))
+            except Exception as error:
+                outcomes.append((None, error))
+        if tree.journal is not None:
+            tree.journal.commit()
+        self.batches += 1
+        self.applied += len(batch)
+        return outcomes
+
+    # Reads: served straight from the tree, between writer batches
+
+    def find(self, order_id):
+        node = self.order_tree.find_order(order_id)
+        return order_record(node) if node is not None else None
+
+    def page(self, page_size, cursor=None):
+        page, next_cursor = self.order_tree.get_page(page_size, cursor)
+        return [order_record(node) for node in page], next_cursor
+
+    # Socket front end
+
+    async def serve(self, host='127.0.0.1', port=8750):
+        return await asyncio.start_server(self._handle_client, host, port)
+
+    async def _handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    reply = await self._handle_request(json.loads(line))
+                except (ValueError, KeyError, TypeError) as error:
+                    reply = {'ok': False, 'error': str(error)}
+                writer.write(json.dumps(reply, default=str).encode('utf-8') + b'\n')
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def _handle_request(self, request):
+        op = request['op']
+        if op == 'add':
+            order = request['order']
+            _integer(order, 'order_id')
+            _integer(order, 'customer_id')
+            return {'ok': await self.submit_add(order_bst.order_from_record(order))}
+        if op == 'status':
+            return {'ok': await self.submit_status(_order_id(request), str(request['status']))}
+        if op == 'get':
+            return {'ok': True, 'order': self.find(_order_id(request))}
+        if op == 'page':
+            page_size = _integer(request, 'page_size', default=50)
+            cursor = request.get('cursor')
+            if cursor is not None and not isinstance(cursor, str):
+                raise ValueError(f"cursor must be a string or null, got {cursor!r}")
+            page, cursor = self.page(page_size, cursor)
+            return {'ok': True, 'orders': page, 'cursor': cursor}
+        raise ValueError(f"unknown op '{op}'")
+
+
+# Order and customer IDs (and page sizes) are JSON integers; anything else is rejected before it
+# reaches the queue or the tree
+def _integer(request, key, default=None):
+    value = request[key] if default is None else request.get(key, default)
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError(f"{key} must be an integer, got {value!r}")
+    return value
+
+def _order_id(request):
+    return _integer(request, 'order_id')
+
+
+# In-process load test: `producers` coroutines each submit their share of `orders` adds
+# (increasing IDs, interleaved), then a status update for every fifth order, while one
+# reader coroutine keeps paging through the tree.
+async def run_benchmark(tree_name='block', producers=100, orders=200000, queue_size=10000,
+                        batch_size=512, journal_filename=None):
+    order_tree = TREES[tree_name]()
+    order_tree.verbose = False
+    journal = None
+    if journal_filename:
+        journal = order_bst.OrderJournal(journal_filename)
+        journal.open(order_tree)
+    service = OrderIntakeService(order_tree, queue_size, batch_size)
+    await service.start()
+
+    async def producer(worker):
+        for order_id in range(worker + 1, orders + 1, producers):
+            await service.submit_add((order_id, order_id % 5000, ('Chair', 1), 'Warehouse Road'))
+        for order_id in range(worker + 1, orders + 1, producers * 5):
+            await service.submit_status(order_id, 'Packed')
+
+    reads = 0
+    finished = asyncio.Event()
+
+    async def reader():
+        nonlocal reads
+        cursor = None
+        while not finished.is_set():
+            page, cursor = service.page(100, cursor)
+            reads += len(page)
+            await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    reader_task = asyncio.create_task(reader())
+    await asyncio.gather(*(producer(worker) for worker in range(producers)))
+    await service.stop()
+    seconds = time.perf_counter() - start
+    finished.set()
+    await reader_task
+    if journal is not None:
+        journal.close()
+    return {'requests': service.applied, 'batches': service.batches, 'seconds': seconds,
+            'requests_per_second': service.applied / seconds if seconds else 0.0, 'orders_read': reads}
+
+async def run_server(host, port, tree_name, journal_filename):
+    order_tree = TREES[tree_name]()
+    journal = None
+    if journal_filename:
+        journal = order_bst.OrderJournal(journal_filename)
+        journal.open(order_tree)
+    service = OrderIntakeService(order_tree)
+    await service.start()
+    server = await service.serve(host, port)
+    print(f"Order intake listening on {host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+        if journal is not None:
+            journal.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Asyncio order-intake service')
+    parser.add_argument('--serve', action='store_true',
+                        help='accept JSON-line requests on a local socket (default: run the load test)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8750)
+    parser.add_argument('--tree', choices=sorted(TREES), default='block')
+    parser.add_argument('--journal', help='order journal file (group-committed once per batch)')
+    parser.add_argument('--producers', type=int, default=100)
+    parser.add_argument('--orders', type=int, default=200000)
+    parser.add_argument('--queue-size', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=512)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        try:
+            asyncio.run(run_server(args.host, args.port, args.tree, args.journal))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    result = asyncio.run(run_benchmark(args.tree, args.producers, args.orders, args.queue_size,
+                                       args.batch_size, args.journal))
+    print(f"{result['requests']} requests in {result['batches']} batches, {result['seconds']:.2f}s: "
+          f"{result['requests_per_second']:.0f} requests/s ({result['orders_read']} orders read meanwhile)")
+
+if __name__ == "__main__":
+    main()